@@ -1,11 +1,37 @@
 import http.server
-import socketserver
+import asyncio
+import socket
+import ctypes
+import ctypes.util
+import errno
+import sys
+import atexit
+import signal
 import json
 import threading
-from datetime import datetime
+import time
 import os
+import mmap
+import queue
 import glob
+import gzip
+import heapq
+import itertools
 from collections import deque
+from operator import itemgetter
+from urllib.parse import urlsplit, parse_qs
+
+# uvloop is optional; when installed the syslog listeners run on libuv's UDP handles.
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# orjson is optional; when installed it replaces json for encoding and decoding log entries.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- Configuration ---
 WEB_HOST = "0.0.0.0"
@@ -14,96 +40,661 @@ SYSLOG_HOST = "0.0.0.0"
 SYSLOG_PORTS = [514, 1514] # Add your desired UDP ports here
 LOG_DIRECTORY = "syslog_logs" # Directory to store log files
 MAX_LOGS_PER_FILE_IN_UI = 1000 # Max logs to read from each file for the UI display
+SYSLOG_RECEIVERS_PER_PORT = 1 # Sockets per port; more than 1 shares them via SO_REUSEPORT (see README)
+SYSLOG_RCVBUF = 16 * 1024 * 1024 # UDP receive buffer per socket, absorbs bursts (capped by net.core.rmem_max)
+LOGS_REFRESH_INTERVAL = 0.5 # Seconds between rebuilds of the cached /logs payload
+LOGS_GZIP_MIN_SIZE = 1024 # /logs responses smaller than this are sent uncompressed
+LOGS_PAGE_SIZE = 200 # Entries the UI loads at first, and per page when scrolling back
+SYSLOG_RECV_BATCH = 64 # Datagrams read per recvmmsg() call on Linux (1 disables batching)
+SYSLOG_MAX_MESSAGE = 8192 # Longer datagrams are truncated when batching
+LOG_FLUSH_INTERVAL = 1.0 # Seconds between writes of received log lines to disk
+LOG_ROTATE_BYTES = 64 * 1024 * 1024 # Log files are moved aside to <port>.log.<time> at this size (0 disables)
+EVENTS_KEEPALIVE = 15 # Seconds between keepalive comments on an idle /events stream
+EVENTS_MAX_BACKLOG = 10000 # Undelivered entries an /events client may fall behind by before it's dropped
+
+# --- Log file writing ---
+# The receivers never touch the disk: they queue each encoded entry in
+# LOG_PENDING, and the writer thread appends everything queued for a port
+# to its file in one write every LOG_FLUSH_INTERVAL.
+LOG_PENDING = {port: [] for port in SYSLOG_PORTS}
+
+# One per port, guarding its LOG_PENDING list: with several receivers per
+# port, each list has more than one writer, but ports never share a list,
+# so they don't need to wait on each other.
+LOG_LOCKS = {port: threading.Lock() for port in SYSLOG_PORTS}
+
+# Each port's current log file; rotated files sit beside it with a suffix
+LOG_PATHS = {port: os.path.join(LOG_DIRECTORY, f"{port}.log") for port in SYSLOG_PORTS}
+
+# Append handles for each port's log file, kept open for the life of the
+# process; filled in by open_log_files() and only written by
+# write_pending_logs(), under LOG_WRITE_LOCK
+LOG_FILES = {}
+LOG_WRITE_LOCK = threading.Lock()
+
+# --- JSON encoding ---
+if orjson:
+    dump_json = orjson.dumps
+    load_json = orjson.loads
+else:
+    def dump_json(obj):
+        """Encodes obj as compact UTF-8 JSON bytes."""
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    load_json = json.loads
+
+# --- Timestamps ---
+# (second, "YYYY-MM-DDTHH:MM:SS") for the last second a timestamp was made in
+_ts_cache = (0, '')
+
+def format_timestamp():
+    """
+    Returns the current local time in ISO 8601 format with microseconds.
+    The date and time part is only formatted once per second.
+    """
+    global _ts_cache
+    # Integer arithmetic: cheaper than splitting a float, and exact
+    sec, usec = divmod(time.time_ns() // 1000, 1000000)
+    cached_sec, prefix = _ts_cache
+    if sec != cached_sec:
+        lt = time.localtime(sec)
+        prefix = (f"{lt.tm_year}-{lt.tm_mon:02d}-{lt.tm_mday:02d}T"
+                  f"{lt.tm_hour:02d}:{lt.tm_min:02d}:{lt.tm_sec:02d}")
+        _ts_cache = (sec, prefix)
+    return f"{prefix}.{usec:06d}"
+
+# --- Syslog priority ---
+SEVERITY_NAMES = ['emerg', 'alert', 'crit', 'err', 'warning', 'notice', 'info', 'debug']
+
+def parse_priority(message):
+    """
+    Returns (facility, severity) from a leading RFC 3164 "<PRI>" in the
+    message, or (None, None) if it doesn't start with one.
+    """
+    if message.startswith('<'):
+        end = message.find('>', 1, 5)
+        digits = message[1:end]
+        if end > 1 and digits.isascii() and digits.isdigit():
+            pri = int(digits)
+            if pri <= 191:
+                return pri >> 3, pri & 7
+    return None, None
+
+# --- In-memory log buffer ---
+# Recent entries per destination port, each deque oldest first, as compact
+# (seq, severity, search_text, entry_json) records. entry_json is the entry
+# already encoded for /logs and search_text its lowercased message, used
+# for server-side filtering; the dicts are not kept. Each deque evicts its
+# oldest entry on overflow, so a busy port can't push out a quiet one's
+# history, and /logs never has to touch the files on disk.
+LOGS = {port: deque(maxlen=MAX_LOGS_PER_FILE_IN_UI) for port in SYSLOG_PORTS}
+LOGS_LOCK = threading.Lock()
+LOGS_VERSION = 0 # Sequence id of the newest entry in LOGS; every entry gets the next one
+
+# Identifies this run of the server. Sequence ids start over on every
+# restart, so the versions handed to clients (event ids, X-Log-Version,
+# ETags) carry it, and one from an earlier run is treated as "since 0".
+BOOT_ID = format(time.time_ns(), 'x')
+_HEX_DIGITS = frozenset('0123456789abcdef')
+
+def version_token(version):
+    """Returns the "<BOOT_ID>-<version>" token clients are given for a version."""
+    return f"{BOOT_ID}-{version}"
+
+# Encoded /logs payload as (LOGS_VERSION it was built from, bytes, gzipped bytes)
+_logs_json_cache = (-1, b'[]', gzip.compress(b'[]', 1))
+
+# Queues of the open /events streams; append_log() pushes each new record
+# to every one of them while holding LOGS_LOCK, so they see records in
+# sequence order. Only changed under LOGS_LOCK.
+SUBSCRIBERS = set()
+
+# --- Syslog UDP Protocol ---
+class SyslogProtocol(asyncio.DatagramProtocol):
+    """
+    Handles incoming syslog datagrams for the port it's serving: each one
+    is encoded once, queued in LOG_PENDING for the writer thread to append
+    to that port's log file, and added to the in-memory buffer.
+    """
+    def __init__(self, port):
+        self.port = port
+
+    def datagram_received(self, data, addr):
+        port = self.port
+        try:
+            # Trim surrounding whitespace (usually a trailing newline) on the
+            # raw bytes, so the decode doesn't have to be copied again
+            data = data.strip()
+            try:
+                message = data.decode('utf-8')
+            except UnicodeDecodeError:
+                # Not UTF-8; latin-1 maps every byte, so this cannot fail
+                message = data.decode('latin-1')
+
+            facility, severity = parse_priority(message)
+
+            log_entry = {
+                "timestamp": format_timestamp(),
+                "source_ip": addr[0],
+                "source_port": addr[1],
+                "destination_port": port,
+                "facility": facility,
+                "severity": severity,
+                "message": message
+            }
+            # Encode once; the same bytes go to disk and to the /logs payload
+            entry_json = dump_json(log_entry)
+
+            # Queue for this port's log file; it reaches the disk on the
+            # writer thread's next pass
+            with LOG_LOCKS[port]:
+                LOG_PENDING[port].append(entry_json)
+
+            append_log(port, entry_json, severity, message.lower())
+
+        except Exception as e:
+            print(f"Error handling syslog message on port {port}: {e}")
+
+def append_log(port, entry_json, severity, search_text):
+    """
+    Adds an entry, given as its compact JSON encoding, to the port's buffer
+    in LOGS under the next sequence id.
+    """
+    global LOGS_VERSION
+    with LOGS_LOCK:
+        port_logs = LOGS.get(port)
+        if port_logs is None:
+            # Only for history loaded from a port that's no longer configured
+            port_logs = LOGS[port] = deque(maxlen=MAX_LOGS_PER_FILE_IN_UI)
+        LOGS_VERSION += 1
+        # Splice the seq in rather than re-encoding the whole entry
+        record = (LOGS_VERSION, severity, search_text,
+                  b'{"seq":%d,' % LOGS_VERSION + entry_json[1:])
+        port_logs.append(record)
+        if SUBSCRIBERS:
+            publish(record)
+
+def publish(record):
+    """
+    Hands a new record to every /events subscriber. A subscriber that has
+    fallen EVENTS_MAX_BACKLOG records behind is dropped and sent None, so
+    its stream ends and the client reconnects and catches up from LOGS.
+    Must be called with LOGS_LOCK held.
+    """
+    for subscriber in list(SUBSCRIBERS):
+        if subscriber.qsize() < EVENTS_MAX_BACKLOG:
+            subscriber.put(record)
+        else:
+            SUBSCRIBERS.discard(subscriber)
+            subscriber.put(None)
+
+def subscribe():
+    """Returns a queue that receives every record appended from now on."""
+    subscriber = queue.SimpleQueue()
+    with LOGS_LOCK:
+        SUBSCRIBERS.add(subscriber)
+    return subscriber
+
+def unsubscribe(subscriber):
+    with LOGS_LOCK:
+        SUBSCRIBERS.discard(subscriber)
+
+def record_matches(record, max_severity, query):
+    """
+    Whether a record passes the server-side filters: `max_severity` keeps
+    only entries with that severity or a more severe one (lower number),
+    and `query` only those whose message contains it (lowercase).
+    """
+    if max_severity is not None and (record[1] is None or record[1] > max_severity):
+        return False
+    return not query or query in record[2]
+
+def merge_newest_first(port_records):
+    """
+    Merges per-port record sequences, each already newest first, into one
+    newest-first iterator by sequence id.
+    """
+    return heapq.merge(*port_records, key=itemgetter(0), reverse=True)
+
+def refresh_logs_json():
+    """
+    Rebuilds the cached /logs payload (newest first), and its gzipped form,
+    if LOGS has changed since it was last built. The buffers are only
+    copied under the lock; the merge, join and compression happen outside
+    it.
+    """
+    global _logs_json_cache
+    with LOGS_LOCK:
+        version = LOGS_VERSION
+        if _logs_json_cache[0] == version:
+            return
+        snapshot = [list(port_logs) for port_logs in LOGS.values()]
+
+    logs = merge_newest_first(reversed(records) for records in snapshot)
+    payload = b'[' + b','.join(e[3] for e in logs) + b']'
+    # Fastest level: most of the saving at a fraction of the CPU
+    _logs_json_cache = (version, payload, gzip.compress(payload, 1))
+
+def run_logs_refresher():
+    """Keeps the cached /logs payload at most LOGS_REFRESH_INTERVAL old."""
+    while True:
+        time.sleep(LOGS_REFRESH_INTERVAL)
+        refresh_logs_json()
+
+def get_logs_json():
+    """
+    Returns (version, payload, gzipped payload) for the full /logs list,
+    newest first.
+    """
+    return _logs_json_cache
+
+def get_logs_since_json(since, max_severity=None, query=None, before=0, limit=0):
+    """
+    Returns (version, payload) for entries newer than sequence id `since`
+    that pass the filters (see record_matches), newest first. A `since`
+    ahead of the buffer (e.g. after a server restart) is treated as 0 so
+    the client can start over. See select_logs for `before` and `limit`.
+    """
+    if since > LOGS_VERSION:
+        since = 0
+    if since == 0 and max_severity is None and not query and not before and not limit:
+        return get_logs_json()[:2]
+    version, new_logs = select_logs(since, max_severity, query, before, limit)
+    return version, b'[' + b','.join(new_logs) + b']'
 
-# --- Thread-safe lock for file writing ---
-# Although each thread writes to its own file, a lock is good practice
-# if you ever consolidate logging. For now, it's less critical.
-log_lock = threading.Lock()
+def select_logs(since, max_severity=None, query=None, before=0, limit=0):
+    """
+    Returns (version, entries): the LOGS_VERSION the selection was taken
+    at, and the encoded entries newer than `since` that pass the filters,
+    newest first. A `before` keeps only entries older than that sequence
+    id, and a `limit` stops after that many, for paging back through the
+    buffer.
+    """
+    filtered = max_severity is not None or query or before or limit
+    with LOGS_LOCK:
+        version = LOGS_VERSION
+        if filtered:
+            # Scan a copy, so ingest isn't blocked while the filters run
+            snapshot = [list(port_logs) for port_logs in LOGS.values()]
+        else:
+            # Entries are appended in sequence order, so walk back from the newest
+            snapshot = [list(itertools.takewhile(lambda record: record[0] > since, reversed(port_logs)))
+                        for port_logs in LOGS.values()]
+
+    if not filtered:
+        return version, [record[3] for record in merge_newest_first(snapshot)]
+
+    new_logs = []
+    for record in merge_newest_first(reversed(records) for records in snapshot):
+        if record[0] <= since:
+            break
+        if before and record[0] >= before:
+            continue
+        if record_matches(record, max_severity, query):
+            new_logs.append(record[3])
+            if len(new_logs) == limit:
+                break
+    return version, new_logs
+
+# --- Batched UDP receive (Linux) ---
+class _IOVec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [('msg_name', ctypes.c_void_p), ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.POINTER(_IOVec)), ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p), ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _MsgHdr), ('msg_len', ctypes.c_uint)]
+
+_SOCKADDR_SIZE = 128 # sizeof(struct sockaddr_storage)
+_ADDRESS_CACHE_SIZE = 4096 # Decoded sender addresses kept per receiver
+_MAX_BATCHES_PER_WAKEUP = 16 # Lets other sockets on the loop run during a flood
+
+def _load_recvmmsg():
+    """Returns glibc's recvmmsg() via ctypes, or None where it's unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        recvmmsg = libc.recvmmsg
+    except (OSError, AttributeError):
+        return None
+    recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint,
+                         ctypes.c_int, ctypes.c_void_p]
+    recvmmsg.restype = ctypes.c_int
+    return recvmmsg
 
-# --- Syslog UDP Handler ---
-def create_syslog_handler(port):
-    """Factory function to create a handler class that knows its port."""
+_recvmmsg = _load_recvmmsg()
 
-    class SyslogUDPHandler(socketserver.BaseRequestHandler):
+def _decode_sockaddr(raw):
+    """Returns (ip, port) from a raw struct sockaddr_in / sockaddr_in6."""
+    family = int.from_bytes(raw[:2], sys.byteorder)
+    port = int.from_bytes(raw[2:4], 'big')
+    if family == socket.AF_INET6:
+        return socket.inet_ntop(socket.AF_INET6, raw[8:24]), port
+    return socket.inet_ntop(socket.AF_INET, raw[4:8]), port
+
+class BatchReceiver:
+    """
+    Reads datagrams from a non-blocking UDP socket with recvmmsg(2), up to
+    SYSLOG_RECV_BATCH per system call, and hands each one to a
+    SyslogProtocol. The receive buffers are allocated once and reused,
+    and senders' decoded addresses are cached, since syslog traffic tends
+    to come from the same few sockets.
+    """
+    def __init__(self, sock, protocol):
+        self.sock = sock
+        self.protocol = protocol
+        self.size = SYSLOG_RECV_BATCH
+        self.buffers = [ctypes.create_string_buffer(SYSLOG_MAX_MESSAGE) for _ in range(self.size)]
+        self.names = [ctypes.create_string_buffer(_SOCKADDR_SIZE) for _ in range(self.size)]
+        self.iovecs = (_IOVec * self.size)()
+        self.msgs = (_MMsgHdr * self.size)()
+        self.addresses = {} # raw sockaddr -> (ip, port)
+        for i in range(self.size):
+            self.iovecs[i].iov_base = ctypes.addressof(self.buffers[i])
+            self.iovecs[i].iov_len = SYSLOG_MAX_MESSAGE
+            hdr = self.msgs[i].msg_hdr
+            hdr.msg_name = ctypes.addressof(self.names[i])
+            hdr.msg_namelen = _SOCKADDR_SIZE
+            hdr.msg_iov = ctypes.pointer(self.iovecs[i])
+            hdr.msg_iovlen = 1
+
+    def read_ready(self):
         """
-        Handles incoming syslog messages and writes them to a file
-        named after the port it's serving.
+        Event loop reader callback: receives and dispatches batches until
+        the socket runs dry (a batch comes back short), up to
+        _MAX_BATCHES_PER_WAKEUP batches.
         """
-        def handle(self):
-            try:
-                data = self.request[0]
-                socket = self.request[1]
-                message = data.decode('utf-8', errors='ignore')
+        fd = self.sock.fileno()
+        datagram_received = self.protocol.datagram_received
+        addresses = self.addresses
+        for _ in range(_MAX_BATCHES_PER_WAKEUP):
+            count = _recvmmsg(fd, self.msgs, self.size, socket.MSG_DONTWAIT, None)
+            if count < 0:
+                err = ctypes.get_errno()
+                if err not in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                    print(f"Error receiving on port {self.protocol.port}: {os.strerror(err)}")
+                return
+
+            for i in range(count):
+                msg = self.msgs[i]
+                data = ctypes.string_at(self.buffers[i], msg.msg_len)
+                raw_addr = self.names[i].raw[:msg.msg_hdr.msg_namelen]
+                addr = addresses.get(raw_addr)
+                if addr is None:
+                    if len(addresses) >= _ADDRESS_CACHE_SIZE:
+                        addresses.clear()
+                    addr = addresses[raw_addr] = _decode_sockaddr(raw_addr)
+                # The kernel overwrites the name length, so reset it for the next call
+                msg.msg_hdr.msg_namelen = _SOCKADDR_SIZE
+                datagram_received(data, addr)
 
-                log_entry = {
-                    "timestamp": datetime.now().isoformat(),
-                    "source_ip": self.client_address[0],
-                    "source_port": self.client_address[1],
-                    "destination_port": port,
-                    "message": message.strip()
-                }
+            if count < self.size:
+                return
+
+# Ports already warned about, so every receiver's socket doesn't repeat it
+_rcvbuf_warned = set()
+
+def set_receive_buffer(sock, port):
+    """
+    Raises the socket's receive buffer to SYSLOG_RCVBUF so bursts queue in
+    the kernel instead of being dropped while the handler catches up.
+    Warns (once per port) if the kernel grants less.
+    """
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SYSLOG_RCVBUF)
+        actual = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        if sys.platform.startswith('linux'):
+            # Linux doubles the granted size for its bookkeeping overhead
+            # and reports the doubled figure
+            actual //= 2
+        if actual < SYSLOG_RCVBUF and port not in _rcvbuf_warned:
+            _rcvbuf_warned.add(port)
+            print(f"Warning: UDP receive buffer on port {port} is {actual} bytes; "
+                  f"raise net.core.rmem_max to allow {SYSLOG_RCVBUF}")
+    except OSError as e:
+        if port not in _rcvbuf_warned:
+            _rcvbuf_warned.add(port)
+            print(f"Warning: Could not set UDP receive buffer on port {port}: {e}")
 
-                # Define the log file path
-                log_file_path = os.path.join(LOG_DIRECTORY, f"{port}.log")
+def bind_syslog_socket(port, reuse_port):
+    """Creates a non-blocking UDP socket bound to SYSLOG_HOST:port."""
+    family, _, _, _, address = socket.getaddrinfo(SYSLOG_HOST, port, type=socket.SOCK_DGRAM)[0]
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    set_receive_buffer(sock, port)
+    sock.bind(address)
+    sock.setblocking(False)
+    return sock
 
-                # Write to the specific log file for this port
-                with log_lock:
-                    with open(log_file_path, 'a') as f:
-                        f.write(json.dumps(log_entry) + '\n')
+def start_syslog_servers():
+    """
+    Starts SYSLOG_RECEIVERS_PER_PORT event loop threads, each listening on
+    every port in SYSLOG_PORTS. With more than one receiver the sockets
+    share their port through SO_REUSEPORT and the kernel spreads incoming
+    datagrams across them. On Linux each socket is drained in batches with
+    recvmmsg(); elsewhere it is a regular asyncio datagram endpoint.
+    """
+    receivers = SYSLOG_RECEIVERS_PER_PORT if hasattr(socket, 'SO_REUSEPORT') else 1
+    batching = _recvmmsg is not None and SYSLOG_RECV_BATCH > 1
+    loops = []
+    for _ in range(receivers):
+        loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+        for port in SYSLOG_PORTS:
+            sock = bind_syslog_socket(port, receivers > 1)
+            if batching:
+                loop.add_reader(sock.fileno(), BatchReceiver(sock, SyslogProtocol(port)).read_ready)
+            else:
+                loop.run_until_complete(loop.create_datagram_endpoint(
+                    lambda port=port: SyslogProtocol(port), sock=sock))
 
-            except Exception as e:
-                print(f"Error handling syslog message on port {port}: {e}")
+        thread = threading.Thread(target=loop.run_forever)
+        thread.daemon = True
+        thread.start()
+        loops.append(loop)
 
-    return SyslogUDPHandler
+    mode = f"recvmmsg batches of {SYSLOG_RECV_BATCH}" if batching else "asyncio"
+    for port in SYSLOG_PORTS:
+        print(f"Syslog server listening on UDP {SYSLOG_HOST}:{port} (receivers: {receivers}, {mode})")
+    return loops
 
 # --- Web Server ---
 class WebServerHandler(http.server.SimpleHTTPRequestHandler):
     """
     Handles web requests to serve the UI and the log data.
     """
+    # Keep connections open between requests; every response therefore
+    # has to carry a Content-Length (or, for /events, close the connection).
+    protocol_version = 'HTTP/1.1'
+    # Each open connection holds a server thread, so close ones that sit
+    # idle (e.g. from closed tabs). /events streams write a keepalive
+    # well within this.
+    timeout = 60
+
     def do_GET(self):
-        if self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            self.wfile.write(self._get_html_content().encode('utf-8'))
-        elif self.path == '/logs':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            logs = self._get_logs_from_files()
-            self.wfile.write(json.dumps(logs).encode('utf-8'))
+        url = urlsplit(self.path)
+        if url.path == '/':
+            self._send_html()
+        elif url.path == '/logs':
+            self._send_logs(parse_qs(url.query))
+        elif url.path == '/events':
+            self._send_events(parse_qs(url.query))
         else:
             super().do_GET()
 
-    def _get_logs_from_files(self):
+    def _send_logs(self, query):
         """
-        Reads the latest logs from all .log files, combines, sorts, and returns them.
+        Serves /logs. With ?since=<seq> only newer entries are returned;
+        ?severity=<0-7 or name> and ?q=<text> filter the entries on the
+        server, and ?before=<seq>&limit=<n> pages back through older
+        ones. Otherwise the full list is sent with an ETag so unchanged
+        polls get a 304. X-Log-Version gives a "<boot id>-<seq>" token for
+        the newest entry the response is current to, which is what to pass
+        as `since` next time, even if the filters matched nothing; after a
+        server restart it is taken as 0. Responses of
+        LOGS_GZIP_MIN_SIZE or more are gzipped for clients that accept it;
+        the full list's compressed form is cached along with it.
         """
-        all_logs = []
-        log_files = glob.glob(os.path.join(LOG_DIRECTORY, '*.log'))
+        if query.keys() & {'since', 'severity', 'q', 'before', 'limit'}:
+            filters = self._parse_log_filters(query)
+            if filters is None:
+                return
+            version, payload = get_logs_since_json(*filters)
+            gzipped = None
+            etag = None
+        else:
+            version, payload, gzipped = get_logs_json()
+            # Weak, since the same version may be sent with different encodings
+            etag = f'W/"{version_token(version)}"'
+            if self._etag_matches(etag):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('X-Log-Version', version_token(version))
+                self.end_headers()
+                return
 
-        for file_path in log_files:
-            try:
-                with open(file_path, 'r') as f:
-                    # Use deque for an efficient way to get the last N lines
-                    last_lines = deque(f, MAX_LOGS_PER_FILE_IN_UI)
-                    for line in last_lines:
-                        try:
-                            all_logs.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            # Handle cases where a line is not valid JSON
-                            print(f"Warning: Could not parse line in {file_path}: {line.strip()}")
-            except Exception as e:
-                print(f"Error reading log file {file_path}: {e}")
-
-        # Sort all collected logs by timestamp in descending order (newest first)
-        all_logs.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        return all_logs
-
-    def _get_html_content(self):
-        """Returns the full HTML for the web interface."""
-        return """
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Vary', 'Accept-Encoding')
+        if len(payload) >= LOGS_GZIP_MIN_SIZE and self._accepts_gzip():
+            payload = gzipped or gzip.compress(payload, 1)
+            self.send_header('Content-Encoding', 'gzip')
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('X-Log-Version', version_token(version))
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _parse_log_filters(self, query, since=None):
+        """
+        Returns (since, max_severity, search, before, limit) from the
+        ?since, ?severity, ?q, ?before and ?limit parameters, or sends a
+        400 and returns None if one is invalid. `since` may be a plain
+        sequence id or a version token; a token from an earlier run of the
+        server counts as 0.
+        """
+        numbers = {}
+        for name in ('since', 'before', 'limit'):
+            value = since if name == 'since' and since else query.get(name, ['0'])[0]
+            if name == 'since':
+                boot, sep, seq = value.partition('-')
+                if sep and boot and set(boot) <= _HEX_DIGITS:
+                    # A version token; the seq still has to be a number
+                    value = seq
+                    if boot != BOOT_ID and seq.isascii() and seq.isdigit():
+                        value = '0'
+            if not (value.isascii() and value.isdigit()):
+                self.send_error(400, f"Invalid '{name}' parameter")
+                return None
+            numbers[name] = int(value)
+        max_severity = None
+        if 'severity' in query:
+            value = query['severity'][0].lower()
+            if value in SEVERITY_NAMES:
+                max_severity = SEVERITY_NAMES.index(value)
+            elif value.isascii() and value.isdigit() and int(value) < len(SEVERITY_NAMES):
+                max_severity = int(value)
+            else:
+                self.send_error(400, "Invalid 'severity' parameter")
+                return None
+        return (numbers['since'], max_severity, query.get('q', [''])[0].lower(),
+                numbers['before'], numbers['limit'])
+
+    def _send_events(self, query):
+        """
+        Serves /events, a Server-Sent Events stream of new entries. Each
+        event's data is a batch in the /logs format (newest first) and its
+        id the version token of the newest entry sent, so a reconnecting
+        EventSource picks up where it left off via Last-Event-ID, or starts
+        over if the server has restarted in between. Takes the same filters as
+        /logs; the entries newer than ?since are sent first, or only the
+        newest LOGS_PAGE_SIZE of them without one (older entries can be
+        paged in from /logs).
+        """
+        filters = self._parse_log_filters(query, self.headers.get('Last-Event-ID'))
+        if filters is None:
+            return
+        since, max_severity, search = filters[:3]
+        if since > LOGS_VERSION:
+            since = 0
+
+        # Subscribe before taking the backlog so nothing falls in between
+        subscriber = subscribe()
+        try:
+            last_seq, backlog = select_logs(since, max_severity, search,
+                                            limit=0 if since else LOGS_PAGE_SIZE)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            # No Content-Length: the stream ends when the connection does
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            self.wfile.write(b'id: %s\ndata: [%s]\n\n' % (version_token(last_seq).encode(), b','.join(backlog)))
+
+            while True:
+                try:
+                    record = subscriber.get(timeout=EVENTS_KEEPALIVE)
+                except queue.Empty:
+                    # Also finds out about clients that have gone away
+                    self.wfile.write(b': keepalive\n\n')
+                    continue
+                # Send whatever else has queued up in the same event
+                records = [record]
+                while record is not None and len(records) < MAX_LOGS_PER_FILE_IN_UI:
+                    try:
+                        record = subscriber.get_nowait()
+                    except queue.Empty:
+                        break
+                    records.append(record)
+                if records[-1] is None:
+                    return
+                # The backlog may already include the first few
+                new_logs = [r[3] for r in reversed(records)
+                            if r[0] > last_seq and record_matches(r, max_severity, search)]
+                last_seq = max(last_seq, records[-1][0])
+                if new_logs:
+                    self.wfile.write(b'id: %s\ndata: [%s]\n\n' % (version_token(last_seq).encode(),
+                                                                  b','.join(new_logs)))
+        except OSError:
+            pass # Client went away
+        finally:
+            unsubscribe(subscriber)
+
+    def _etag_matches(self, etag):
+        """
+        Returns True if the request's If-None-Match lists `etag`, using the
+        weak comparison RFC 7232 prescribes for that header.
+        """
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        if header.strip() == '*':
+            return True
+        tags = [tag.strip() for tag in header.split(',')]
+        return etag[2:] in [tag[2:] if tag.startswith('W/') else tag for tag in tags]
+
+    def _accepts_gzip(self):
+        return 'gzip' in self.headers.get('Accept-Encoding', '')
+
+    def _send_html(self):
+        """
+        Serves the UI page, gzipped if the client accepts it. Headers and
+        body are prebuilt, so this is a single write.
+        """
+        if self._accepts_gzip():
+            response = HTML_GZ_RESPONSE
+        else:
+            response = HTML_RESPONSE
+        self.log_request(200)
+        self.wfile.write(response)
+
+HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -146,6 +737,7 @@ class WebServerHandler(http.server.SimpleHTTPRequestHandler):
         .col-timestamp { width: 180px; color: var(--green); }
         .col-source { width: 200px; color: var(--peach); }
         .col-port { width: 120px; color: var(--red); }
+        .col-severity { width: 130px; color: var(--mauve); }
         .column-filter {
             width: 100%; box-sizing: border-box; background-color: var(--overlay-color);
             color: var(--base-color); border: 1px solid var(--border-color);
@@ -166,102 +758,402 @@ class WebServerHandler(http.server.SimpleHTTPRequestHandler):
                         <th class="col-timestamp">Timestamp</th>
                         <th class="col-source">Source</th>
                         <th class="col-port">Dest Port</th>
+                        <th class="col-severity">Severity</th>
                         <th class="col-message">Message</th>
                     </tr>
                     <tr>
                         <th><input type="text" class="column-filter" id="filterTimestamp" placeholder="Filter timestamp..."></th>
                         <th><input type="text" class="column-filter" id="filterSource" placeholder="Filter source..."></th>
                         <th><input type="text" class="column-filter" id="filterPort" placeholder="Filter port..."></th>
+                        <th>
+                            <select class="column-filter" id="filterSeverity">
+                                <option value="">All</option>
+                                <option value="0">emerg</option>
+                                <option value="1">alert+</option>
+                                <option value="2">crit+</option>
+                                <option value="3">err+</option>
+                                <option value="4">warning+</option>
+                                <option value="5">notice+</option>
+                                <option value="6">info+</option>
+                                <option value="7">debug+</option>
+                            </select>
+                        </th>
                         <th><input type="text" class="column-filter" id="filterMessage" placeholder="Filter message..."></th>
                     </tr>
                 </thead>
                 <tbody id="logTableBody"></tbody>
             </table>
+            <div id="olderLogs"></div>
         </div>
     </div>
     <script>
         const logTableBody = document.getElementById('logTableBody');
-        const filterInputs = document.querySelectorAll('.column-filter');
         const filterTimestamp = document.getElementById('filterTimestamp');
         const filterSource = document.getElementById('filterSource');
         const filterPort = document.getElementById('filterPort');
         const filterMessage = document.getElementById('filterMessage');
-        let logsCache = [];
-        let viewNeedsUpdate = true;
+        const filterSeverity = document.getElementById('filterSeverity');
+        const olderLogs = document.getElementById('olderLogs');
+        const MAX_LOGS = __MAX_LOGS__; // Size of the server's log buffer
+        const PAGE_SIZE = __PAGE_SIZE__; // Entries per page of older logs
+        const SEVERITY_NAMES = ['emerg', 'alert', 'crit', 'err', 'warning', 'notice', 'info', 'debug'];
+        let logsCache = []; // Newest first, one table row each
+        const rowsById = new Map(); // seq -> <tr>
+        let lastSeq = 0;
+        let serverBoot = null; // Boot id of the server run the seq ids come from
+        let events = null; // EventSource for the current server-side filters
+        let messageFilterTimer = null;
+        let pendingUpdate = null; // Animation frame for a scheduled updateTable()
+        let tableGeneration = 0; // Bumped whenever the table starts over
+        let hasOlder = false; // Whether the server may have older entries to page in
+        let loadingOlder = false;
 
-        async function fetchLogs() {
+        function filterQuery() {
+            // Severity and message filters are applied by the server
+            let query = '';
+            if (filterSeverity.value !== '') query += `&severity=${filterSeverity.value}`;
+            if (filterMessage.value) query += `&q=${encodeURIComponent(filterMessage.value)}`;
+            return query;
+        }
+
+        function addLogs(newLogs, boot) {
+            // newLogs is newest first, like /logs
+            if (boot !== serverBoot) {
+                // The server restarted and renumbered its entries; start over
+                if (serverBoot !== null) clearTable();
+                serverBoot = boot;
+            }
+            if (newLogs.length === 0) return;
+
+            const unseen = newLogs.filter(log => log.seq > lastSeq);
+            if (lastSeq === 0) {
+                // The first batch is only the newest page
+                hasOlder = unseen.length >= PAGE_SIZE;
+                checkOlderLogs();
+            }
+            lastSeq = newLogs[0].seq;
+
+            // Only the new entries get rows, added above the existing ones
+            logTableBody.prepend(createRows(unseen));
+
+            // Drop the oldest rows once past the size of the server's buffer
+            logsCache = unseen.concat(logsCache);
+            for (const log of logsCache.splice(MAX_LOGS)) {
+                rowsById.get(log.seq).remove();
+                rowsById.delete(log.seq);
+            }
+        }
+
+        async function loadOlderLogs() {
+            // Page in the entries before the oldest one shown
+            if (loadingOlder || !hasOlder || logsCache.length === 0 || logsCache.length >= MAX_LOGS) return;
+            loadingOlder = true;
+            const generation = tableGeneration;
             try {
-                const response = await fetch('/logs');
-                const newLogs = await response.json();
-
-                if (JSON.stringify(newLogs) !== JSON.stringify(logsCache)) {
-                    logsCache = newLogs;
-                    viewNeedsUpdate = true;
-                    updateTable();
-                }
+                const before = logsCache[logsCache.length - 1].seq;
+                const response = await fetch(`/logs?before=${before}&limit=${PAGE_SIZE}${filterQuery()}`);
+                const older = await response.json();
+                // Drop pages for a table that has started over since the
+                // request, or from a server run the table isn't showing
+                const boot = (response.headers.get('X-Log-Version') || '').split('-')[0];
+                if (generation !== tableGeneration || boot !== serverBoot) return;
+
+                hasOlder = older.length >= PAGE_SIZE;
+                logTableBody.append(createRows(older));
+                logsCache = logsCache.concat(older);
             } catch (error) {
-                console.error('Error fetching logs:', error);
+                console.error('Error loading older logs:', error);
+            } finally {
+                loadingOlder = false;
             }
+            checkOlderLogs();
         }
 
-        function updateTable() {
-            const timestampFilter = filterTimestamp.value.toLowerCase();
-            const sourceFilter = filterSource.value.toLowerCase();
-            const portFilter = filterPort.value.toLowerCase();
-            const messageFilter = filterMessage.value.toLowerCase();
+        // Load the next page whenever the end of the table scrolls into view
+        const olderObserver = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) loadOlderLogs();
+        }, {root: document.querySelector('.log-container'), rootMargin: '200px'});
+
+        function checkOlderLogs() {
+            // Observing anew reports the current visibility, so a page that
+            // didn't fill the view is followed by the next one
+            olderObserver.unobserve(olderLogs);
+            if (hasOlder) olderObserver.observe(olderLogs);
+        }
 
-            let tableHtml = '';
+        function createRows(logs) {
+            const filters = clientFilters();
+            const fragment = document.createDocumentFragment();
+            for (const log of logs) {
+                // Lowercase the filterable fields once, not on every filter change
+                log._lc = {
+                    ts: log.timestamp.toLowerCase(),
+                    src: `${log.source_ip}:${log.source_port}`.toLowerCase(),
+                    port: String(log.destination_port),
+                };
+                const row = createRow(log);
+                row.hidden = !matchesFilters(log, filters);
+                rowsById.set(log.seq, row);
+                fragment.appendChild(row);
+            }
+            return fragment;
+        }
+
+        function connectEvents() {
+            // The server pushes new entries as they arrive; after a dropped
+            // connection EventSource reconnects and resumes from the last
+            // event id on its own.
+            if (events) events.close();
+            events = new EventSource(`/events?since=${lastSeq}${filterQuery()}`);
+            events.onmessage = event => addLogs(JSON.parse(event.data), event.lastEventId.split('-')[0]);
+            events.onerror = () => console.error('Log stream interrupted, reconnecting');
+        }
+
+        function createRow(log) {
+            const row = document.createElement('tr');
+            const cells = [
+                ['col-timestamp', log.timestamp],
+                ['col-source', `${log.source_ip}:${log.source_port}`],
+                ['col-port', log.destination_port],
+                ['col-severity', log.severity != null ? SEVERITY_NAMES[log.severity] : ''],
+                ['', log.message],
+            ];
+            for (const [className, text] of cells) {
+                const cell = document.createElement('td');
+                if (className) cell.className = className;
+                cell.textContent = text; // Never parsed as HTML
+                row.appendChild(cell);
+            }
+            return row;
+        }
+
+        function clientFilters() {
+            // Timestamp, source and port are filtered here in the browser
+            return {
+                timestamp: filterTimestamp.value.toLowerCase(),
+                source: filterSource.value.toLowerCase(),
+                port: filterPort.value.toLowerCase(),
+            };
+        }
+
+        function matchesFilters(log, filters) {
+            return log._lc.ts.includes(filters.timestamp) &&
+                log._lc.src.includes(filters.source) &&
+                log._lc.port.includes(filters.port);
+        }
+
+        function updateTable() {
+            // Rows stay in the table; filtering only shows or hides them
+            const filters = clientFilters();
             for (const log of logsCache) {
-                const logTimestamp = log.timestamp.toLowerCase();
-                const logSource = `${log.source_ip}:${log.source_port}`.toLowerCase();
-                const logPort = String(log.destination_port).toLowerCase();
-                const logMessage = log.message.toLowerCase();
-
-                if (
-                    logTimestamp.includes(timestampFilter) &&
-                    logSource.includes(sourceFilter) &&
-                    logPort.includes(portFilter) &&
-                    logMessage.includes(messageFilter)
-                ) {
-                    tableHtml += `
-                        <tr>
-                            <td class="col-timestamp">${log.timestamp}</td>
-                            <td class="col-source">${log.source_ip}:${log.source_port}</td>
-                            <td class="col-port">${log.destination_port}</td>
-                            <td>${escapeHtml(log.message)}</td>
-                        </tr>
-                    `;
-                }
+                rowsById.get(log.seq).hidden = !matchesFilters(log, filters);
             }
-            logTableBody.innerHTML = tableHtml;
-            viewNeedsUpdate = false;
         }
 
-        function escapeHtml(unsafe) {
-            if (!unsafe) return '';
-            return unsafe
-                 .replace(/&/g, "&amp;")
-                 .replace(/</g, "&lt;")
-                 .replace(/>/g, "&gt;")
-                 .replace(/"/g, "&quot;")
-                 .replace(/'/g, "&#039;");
+        function scheduleUpdate() {
+            // Apply the filters at most once per frame, however fast the typing
+            if (pendingUpdate) return;
+            pendingUpdate = requestAnimationFrame(() => {
+                pendingUpdate = null;
+                updateTable();
+            });
+        }
+
+        function clearTable() {
+            tableGeneration++;
+            hasOlder = false;
+            checkOlderLogs();
+            lastSeq = 0;
+            logsCache = [];
+            rowsById.clear();
+            logTableBody.replaceChildren();
+        }
+
+        function applyServerFilters() {
+            // Start over with the new severity/message filters
+            clearTable();
+            connectEvents();
         }
 
-        filterInputs.forEach(input => {
-            input.addEventListener('input', updateTable);
+        [filterTimestamp, filterSource, filterPort].forEach(input => {
+            input.addEventListener('input', scheduleUpdate);
+        });
+        filterSeverity.addEventListener('change', applyServerFilters);
+        filterMessage.addEventListener('input', () => {
+            // Wait for a pause in typing before asking the server
+            clearTimeout(messageFilterTimer);
+            messageFilterTimer = setTimeout(applyServerFilters, 300);
         });
 
-        setInterval(fetchLogs, 3000); // Refresh data every 3 seconds
-        fetchLogs(); // Initial fetch
+        connectEvents();
     </script>
 </body>
 </html>
-        """;
+"""
+
+def build_html_response(body, *headers):
+    """Returns a complete 200 response for the UI page, headers included."""
+    head = ['HTTP/1.1 200 OK', 'Content-Type: text/html; charset=utf-8',
+            'Vary: Accept-Encoding', *headers, f'Content-Length: {len(body)}']
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+# The UI page never changes at runtime, so build its responses once
+HTML_BYTES = (HTML_TEMPLATE
+              .replace('__MAX_LOGS__', str(MAX_LOGS_PER_FILE_IN_UI * len(SYSLOG_PORTS)))
+              .replace('__PAGE_SIZE__', str(LOGS_PAGE_SIZE))).encode('utf-8')
+HTML_RESPONSE = build_html_response(HTML_BYTES)
+HTML_GZ_RESPONSE = build_html_response(gzip.compress(HTML_BYTES, 9), 'Content-Encoding: gzip')
+
+def open_log_files():
+    """
+    Opens an append handle on each port's log file, kept for the life of
+    the process. Anything still queued is written, and the handles closed,
+    at exit.
+    """
+    for port in SYSLOG_PORTS:
+        LOG_FILES[port] = open(LOG_PATHS[port], 'ab')
+    atexit.register(close_log_files)
+
+def write_pending_logs():
+    """
+    Appends the lines queued in LOG_PENDING to their files, one write per
+    port. The lists are only swapped out under the port locks, so the
+    receivers aren't held up by the disk.
+    """
+    with LOG_WRITE_LOCK:
+        for port, f in list(LOG_FILES.items()):
+            with LOG_LOCKS[port]:
+                lines, LOG_PENDING[port] = LOG_PENDING[port], []
+            if lines:
+                lines.append(b'')
+                f.write(b'\n'.join(lines))
+                f.flush()
+                if LOG_ROTATE_BYTES and f.tell() >= LOG_ROTATE_BYTES:
+                    LOG_FILES[port] = rotate_log_file(port, f)
+
+def rotate_log_file(port, f):
+    """
+    Closes a port's log file, renames it to <port>.log.<YYYYmmdd-HHMMSS>
+    and returns an append handle on a fresh one.
+    """
+    f.close()
+    log_file_path = LOG_PATHS[port]
+    rotated_path = base_path = f"{log_file_path}.{time.strftime('%Y%m%d-%H%M%S')}"
+    suffix = 1
+    while os.path.exists(rotated_path):
+        rotated_path = f"{base_path}-{suffix}"
+        suffix += 1
+    try:
+        os.rename(log_file_path, rotated_path)
+    except OSError as e:
+        # Keep appending to the same file rather than losing logs
+        print(f"Error rotating log file {log_file_path}: {e}")
+    return open(log_file_path, 'ab')
+
+def run_log_writer():
+    """Keeps received log lines at most LOG_FLUSH_INTERVAL from disk."""
+    while True:
+        time.sleep(LOG_FLUSH_INTERVAL)
+        try:
+            write_pending_logs()
+        except Exception as e:
+            print(f"Error writing log files: {e}")
+
+def close_log_files():
+    """
+    Writes out whatever is still queued and closes every log file handle.
+    The writer thread and receivers may still be running during exit, so
+    the handles are also dropped from LOG_FILES, leaving any later
+    write_pending_logs() nothing to write to.
+    """
+    write_pending_logs()
+    with LOG_WRITE_LOCK:
+        for f in LOG_FILES.values():
+            f.close()
+        LOG_FILES.clear()
+
+def tail_lines(file_path, count):
+    """
+    Returns up to the last `count` non-empty lines of a file, oldest first.
+    The file is memory-mapped and scanned backwards from the end, so only
+    its tail is read, however large it is.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return [] # Empty files can't be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            lines = []
+            end = len(mm)
+            while end > 0 and len(lines) < count:
+                start = mm.rfind(b'\n', 0, end) + 1
+                if start < end:
+                    lines.append(mm[start:end])
+                end = start - 1
+    lines.reverse()
+    return lines
+
+def parse_log_line(line):
+    """
+    Returns the entry a log file line holds, or None if it isn't valid
+    JSON (or UTF-8) or not shaped like an entry this server writes. Entries
+    without a usable severity (e.g. written before priorities were parsed
+    at ingest) get one from the message.
+    """
+    try:
+        log_entry = load_json(line)
+    except ValueError:
+        return None
+    if not (isinstance(log_entry, dict)
+            and isinstance(log_entry.get("message", ""), str)
+            and isinstance(log_entry.get("timestamp", ""), str)
+            and isinstance(log_entry.get("destination_port"), (int, type(None)))):
+        return None
+    severity = log_entry.get("severity")
+    if not isinstance(severity, int) or isinstance(severity, bool) or not 0 <= severity < len(SEVERITY_NAMES):
+        log_entry["facility"], log_entry["severity"] = parse_priority(log_entry.get("message", ""))
+    return log_entry
+
+def load_recent_logs():
+    """
+    Fills the in-memory buffer with the latest logs from all .log files,
+    so the UI shows history from before a restart. If a file was rotated
+    recently and is short, the rest comes from its newest rotated segment.
+    """
+    all_logs = []
+    log_files = glob.glob(os.path.join(LOG_DIRECTORY, '*.log'))
+
+    for file_path in log_files:
+        try:
+            last_lines = tail_lines(file_path, MAX_LOGS_PER_FILE_IN_UI)
+            rotated = sorted(glob.glob(glob.escape(file_path) + '.*'))
+            if len(last_lines) < MAX_LOGS_PER_FILE_IN_UI and rotated:
+                last_lines[:0] = tail_lines(rotated[-1], MAX_LOGS_PER_FILE_IN_UI - len(last_lines))
+            for line in last_lines:
+                log_entry = parse_log_line(line)
+                if log_entry is None:
+                    print(f"Warning: Could not parse line in {file_path}: "
+                          f"{line.strip().decode('utf-8', errors='replace')}")
+                    continue
+                all_logs.append(log_entry)
+        except Exception as e:
+            print(f"Error reading log file {file_path}: {e}")
+
+    # Sort all collected logs by timestamp, oldest first
+    all_logs.sort(key=lambda x: x.get('timestamp', ''))
+    for log_entry in all_logs:
+        log_entry.pop("seq", None)
+        message = log_entry.get("message", "")
+        append_log(log_entry.get("destination_port"), dump_json(log_entry),
+                   log_entry["severity"], message.lower())
 
 def run_web_server():
-    """Starts the HTTP web server in a thread."""
+    """
+    Starts the HTTP web server. Each request is handled on its own thread,
+    so a slow client doesn't hold up other browsers, and each /events
+    stream keeps its thread for as long as it's open.
+    """
     try:
-        with socketserver.TCPServer((WEB_HOST, WEB_PORT), WebServerHandler) as httpd:
+        with http.server.ThreadingHTTPServer((WEB_HOST, WEB_PORT), WebServerHandler) as httpd:
             print(f"Web interface available at http://{WEB_HOST}:{WEB_PORT}")
             httpd.serve_forever()
     except Exception as e:
@@ -273,17 +1165,36 @@ if __name__ == "__main__":
         os.makedirs(LOG_DIRECTORY)
         print(f"Created log directory: {LOG_DIRECTORY}")
 
-    # --- Start a thread for each syslog port ---
-    for port in SYSLOG_PORTS:
-        handler_class = create_syslog_handler(port)
-        server = socketserver.UDPServer((SYSLOG_HOST, port), handler_class)
+    load_recent_logs()
 
-        thread = threading.Thread(target=server.serve_forever)
-        thread.daemon = True
-        thread.start()
-        print(f"Syslog server listening on UDP {SYSLOG_HOST}:{port}")
+    # --- Keep the log files open, writing to them in the background ---
+    open_log_files()
+    writer = threading.Thread(target=run_log_writer)
+    writer.daemon = True
+    writer.start()
+    # kill, systemctl stop and docker stop send SIGTERM, whose default action
+    # skips the atexit hooks and with them the lines still queued; exit
+    # normally instead so they get written
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    # --- Build the /logs payload in the background, not per request ---
+    refresh_logs_json()
+    refresher = threading.Thread(target=run_logs_refresher)
+    refresher.daemon = True
+    refresher.start()
+
+    # --- Service the syslog ports from the receiver event loop threads ---
+    loops = start_syslog_servers()
 
     # --- Start the web server in the main thread ---
+    # serve_forever() blocks in select(), so the main thread sleeps rather
+    # than spinning while the receiver threads do the work.
     print(f"Web interface starting on http://localhost:{WEB_PORT}")
-    run_web_server()
+    try:
+        run_web_server()
+    except (KeyboardInterrupt, SystemExit):
+        print("Shutting down")
+    finally:
+        for loop in loops:
+            loop.call_soon_threadsafe(loop.stop)
 